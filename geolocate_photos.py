@@ -1,14 +1,29 @@
+from __future__ import annotations
+
 import os
 import datetime
+import functools
+import mmap
+import shutil
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, NamedTuple
 from zoneinfo import ZoneInfo
-import xml.etree.ElementTree as ET
 
-from exif import Image
-import tzlocal
-import pandas as pd
-import numpy as np
 import argparse
 
+# pandas, numpy, exif, lxml and tzlocal are imported inside the functions that use them,
+# so startup (and each worker process) only pays for them when they're needed
+if TYPE_CHECKING:
+    from exif import Image
+    import pandas as pd
+    import numpy as np
+
+# Bytes read from the start of a jpeg when looking for its exif segment
+HEADER_WINDOW = 65536
+
 parser = argparse.ArgumentParser(
     description="""Add gps coordinates to photos by comparing photo timestamps
  against a .gpx file and interpolating latitude and longitude.""",
@@ -23,55 +38,173 @@ parser.add_argument(
 )
 
 
-def extract_points(filepath) -> pd.DataFrame:
+class PhotoSummary(NamedTuple):
     """
-    Extracts gps coordinates and timestamps from a .gpx file to a dataframe
+    The exif details needed to summarize and tag a photo, without holding on to the parsed exif
     """
-    points = ET.parse(filepath)
-    root = points.getroot()
 
-    header = ["Time", "Datetime", "Timestamp", "Latitude", "Longitude"]
-    point_list = []
+    path: str
+    dt: datetime.datetime | None
+    has_loc: bool
+
+
+@dataclass(slots=True)
+class GpxTrack:
+    """
+    Trackpoints from a .gpx file, stored as separate contiguous numpy arrays sorted by time,
+    with the time bounds as naive local datetimes and as timestamps. Bounds are None for an empty track.
+    """
 
-    tz = get_timezone()
+    ts: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    mindt: datetime.datetime | None
+    maxdt: datetime.datetime | None
+    mindt_ts: float | None
+    maxdt_ts: float | None
+
+    def __post_init__(self):
+        import numpy as np
+
+        assert np.all(np.diff(self.ts) >= 0), "trackpoints must be sorted by timestamp"
+
+
+def extract_points(filepath) -> GpxTrack:
+    """
+    Extracts gps coordinates and timestamps from a .gpx file, sorted by time
+    """
+    import numpy as np
+    import pandas as pd
+    from lxml import etree
+
+    # Fill preallocated typed arrays (doubling when full) instead of growing lists of boxed python objects
+    times = np.empty(1024, dtype=object)
+    lat = np.empty(1024, dtype=np.float64)
+    lon = np.empty(1024, dtype=np.float64)
+    n = 0
 
     namespace = "{http://www.topografix.com/GPX/1/1}"
-    for elm in root.findall(f".//{namespace}trkpt"):
-        time = elm.findall(f".//{namespace}time")[0].text
-        dt = datetime.datetime.strptime(time, "%Y-%m-%dT%H:%M:%S%z").astimezone(tz).replace(tzinfo=None)
-        ts = dt.timestamp()
-        lon = float(elm.get("lon"))
-        lat = float(elm.get("lat"))
-        point_list.append([time, dt, ts, lat, lon])
+    for _, elm in etree.iterparse(filepath, events=("end",), tag=f"{namespace}trkpt"):
+        if n == len(lat):
+            times = np.concatenate([times, np.empty_like(times)])
+            lat = np.concatenate([lat, np.empty_like(lat)])
+            lon = np.concatenate([lon, np.empty_like(lon)])
+
+        times[n] = elm.find(f"{namespace}time").text
+        lat[n] = float(elm.get("lat"))
+        lon[n] = float(elm.get("lon"))
+        n += 1
+
+        # Free the finished point and its already-read siblings so the tree never builds up in memory
+        elm.clear(keep_tail=False)
+        while elm.getprevious() is not None:
+            del elm.getparent()[0]
+
+    lat = lat[:n].copy()
+    lon = lon[:n].copy()
+
+    # Parse all times in one pass. Datetimes are naive local time, to compare against photo times;
+    # timestamps are seconds since the epoch, matching datetime.timestamp() on those naive local times
+    utc_dts = pd.to_datetime(times[:n], format="%Y-%m-%dT%H:%M:%S%z", utc=True)
+    dts = _utc_to_local_naive(utc_dts, get_timezone())
+    ts = ((utc_dts - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+
+    if not np.all(np.diff(ts) >= 0):
+        order = np.argsort(ts, kind="stable")
+        ts, lat, lon, dts = ts[order], lat[order], lon[order], dts[order]
+
+    if n == 0:
+        return GpxTrack(ts=ts, lat=lat, lon=lon, mindt=None, maxdt=None, mindt_ts=None, maxdt_ts=None)
+
+    return GpxTrack(
+        ts=ts,
+        lat=lat,
+        lon=lon,
+        mindt=dts.min().to_pydatetime(),
+        maxdt=dts.max().to_pydatetime(),
+        mindt_ts=float(ts[0]),
+        maxdt_ts=float(ts[-1]),
+    )
+
+
+def _utc_to_local_naive(utc_dts: pd.DatetimeIndex, tz: ZoneInfo) -> pd.DatetimeIndex:
+    """
+    Converts utc datetimes to naive local datetimes.
+    pandas converts to a zoneinfo zone with a utcoffset() call per point, so when the utc offset is the same
+    at both ends of a short window (no DST change inside it) a single fixed offset is added instead.
+    """
+    import pandas as pd
 
-    points_df = pd.DataFrame(point_list, columns=header)
-    return points_df
+    if len(utc_dts) == 0:
+        return utc_dts.tz_localize(None)
 
+    first = utc_dts.min()
+    last = utc_dts.max()
+    offset = first.tz_convert(tz).utcoffset()
+    if last - first <= pd.Timedelta(days=7) and last.tz_convert(tz).utcoffset() == offset:
+        return utc_dts.tz_localize(None) + offset
+    return utc_dts.tz_convert(tz).tz_localize(None)
 
-def deg_to_dms(deg):
-    """Convert from decimal degrees to degrees, minutes, seconds.
+
+def deg_to_dms_batch(deg) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Convert an array of decimal degrees to arrays of degrees, minutes, seconds and hemisphere.
     Modified from:
     https://scipython.com/book/chapter-2-the-core-python-language-i/additional-problems/converting-decimal-degrees-to-deg-min-sec/
     """
+    import numpy as np
+
+    deg = np.asarray(deg, dtype=np.float64)
 
-    mins, secs = divmod(abs(deg) * 3600, 60)
-    degs, mins = divmod(mins, 60)
-    if deg < 0:
-        degs = -degs
-    degs, mins = int(degs), int(mins)
-    hemi = 1 if degs > 0 else -1
+    mins, secs = np.divmod(np.abs(deg) * 3600, 60)
+    degs, mins = np.divmod(mins, 60)
+    degs = np.where(deg < 0, -degs, degs).astype(np.int32)
+    mins = mins.astype(np.int32)
+    hemi = np.where(degs > 0, 1, -1).astype(np.int8)
     degs *= hemi
 
     return degs, mins, secs, hemi
 
 
+def deg_to_dms(deg):
+    """Convert from decimal degrees to degrees, minutes, seconds."""
+    degs, mins, secs, hemi = deg_to_dms_batch([deg])
+    return int(degs[0]), int(mins[0]), float(secs[0]), int(hemi[0])
+
+
+@functools.lru_cache(maxsize=None)
 def get_timezone() -> ZoneInfo:
+    import tzlocal
+
     return tzlocal.get_localzone()
 
 
-def load_photo(path: str) -> Image:
+def load_photo(path: str) -> tuple[Image, bool, bool, str | None]:
+    """
+    Loads a photo and probes its exif once, returning (photo, has_loc, has_dt, datetime_original)
+    """
+    from exif import Image
+
     with open(path, "rb") as image_file:
-        return Image(image_file)
+        photo = Image(image_file)
+    has_dt = photo_has_datetime(photo)
+    return photo, photo_has_lat_long(photo), has_dt, photo.datetime_original if has_dt else None
+
+
+def summarize(path: str) -> PhotoSummary:
+    probed = probe_jpeg_header(path)
+    if probed is None:
+        # header couldn't be probed directly, fall back to a full exif parse
+        _, has_loc, _, dt_str = load_photo(path)
+    else:
+        dt_str, has_loc = probed
+
+    dt = None
+    if dt_str is not None:
+        try:
+            dt = _fast_exif_dt(dt_str)
+        except ValueError as e:
+            print("summarize", e, path)
+    return PhotoSummary(path, dt, has_loc)
 
 
 def photo_has_lat_long(photo: Image) -> bool:
@@ -95,9 +228,16 @@ def photo_has_datetime(photo: Image) -> bool:
         return False
 
 
+def _fast_exif_dt(s: str) -> datetime.datetime:
+    """
+    Parses an exif "%Y:%m:%d %H:%M:%S" datetime by slicing its fixed-width fields, which is much faster than strptime
+    """
+    return datetime.datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]))
+
+
 def get_photo_datetime(photo: Image, timezone: ZoneInfo = None) -> datetime.datetime:
     try:
-        dt = datetime.datetime.strptime(photo.datetime_original, "%Y:%m:%d %H:%M:%S")
+        dt = _fast_exif_dt(photo.datetime_original)
         if timezone:
             return dt.astimezone(timezone)
         else:
@@ -106,74 +246,269 @@ def get_photo_datetime(photo: Image, timezone: ZoneInfo = None) -> datetime.date
         print("get_photo_datetime", e, photo)
 
 
-def tag_photos(
-    points_df: pd.DataFrame,
-    photo_paths: list[str],
-    photo_date_offset: pd.Timedelta = None,
-    valid_filetypes=[".jpg", ".jpeg"],
-    overwrite=False,  # TODO add checkbox to GUI
-):
+def _exif_segment_span(data: bytes) -> tuple[int, int] | None:
     """
-    Adds location data to photos by interpolating timestamps from gps data
+    Returns the (start, end) byte offsets of the APP1 exif segment in jpeg data, or None if there isn't one
     """
-
-    mindt = points_df["Datetime"].min()
-    maxdt = points_df["Datetime"].max()
-
-    paths = [f for f in photo_paths if os.path.splitext(f)[1].lower() in valid_filetypes]
-
-    for photo_path in paths:
-        with open(photo_path, "rb") as image_file:
-            photo = Image(image_file)
-
-        # Check if file has a time to interpolate from
-        if not photo_has_datetime(photo):
-            print(f"{photo_path} : skipping, no time available")
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # fill byte before a marker
+            pos += 1
             continue
+        if marker in (0xD9, 0xDA):
+            # end of image / start of scan, no metadata segments follow
+            return None
+        length = int.from_bytes(data[pos + 2 : pos + 4], "big")
+        if marker == 0xE1 and data[pos + 4 : pos + 10] == b"Exif\x00\x00":
+            return pos, pos + 2 + length
+        pos += 2 + length
+    return None
 
-        # Check if lat/long already exist on file. If so, skip
-        if photo_has_lat_long(photo) and not overwrite:
-            print(f"{photo_path} : skipping, location already exists")
-            continue
 
-        # Retrieve datetime from photo, check if inside bounds
-        photodt = get_photo_datetime(photo) + photo_date_offset
-        photots = photodt.timestamp()
+def _read_ifd_tags(data, pos: int, endian: str) -> dict[int, int] | None:
+    """
+    Maps each tag in the tiff IFD at byte offset pos to the offset of its 12 byte entry,
+    or None if the IFD runs past data
+    """
+    if pos + 2 > len(data):
+        return None
+    (count,) = struct.unpack_from(endian + "H", data, pos)
+    if pos + 2 + count * 12 > len(data):
+        return None
+    return {
+        struct.unpack_from(endian + "H", data, entry)[0]: entry for entry in range(pos + 2, pos + 2 + count * 12, 12)
+    }
 
-        if photodt < mindt or photodt > maxdt:
-            photo_t = photodt.isoformat()
-            min_t = mindt.isoformat()
-            max_t = maxdt.isoformat()
-            print(f"{photo_path} : skipping, time {photo_t} outside of bounds {min_t} - {max_t}")
-            continue
 
-        print(f"{photo_path} : adding location")
-        photolat = np.interp(photots, points_df["Timestamp"], points_df["Latitude"])
-        photolon = np.interp(photots, points_df["Timestamp"], points_df["Longitude"])
+def probe_jpeg_header(path: str, window: int = HEADER_WINDOW) -> tuple[str | None, bool] | None:
+    """
+    Reads datetime_original, and whether a full gps location is present, straight from the exif segment at the start
+    of a jpeg, without parsing the whole file. Returns None if the header can't be probed within the first window bytes
+    (not a jpeg, no exif segment, or an unusual layout), in which case the caller should fall back to load_photo.
+    """
+    with open(path, "rb") as image_file:
+        size = os.fstat(image_file.fileno()).st_size
+        if size == 0:
+            return None
+        with mmap.mmap(image_file.fileno(), min(size, window), access=mmap.ACCESS_READ) as data:
+            span = _exif_segment_span(data)
+            if span is None:
+                return None
+
+            # The tiff header follows the segment marker, length and "Exif\0\0"; IFD offsets are relative to it.
+            # The segment's length field can claim more than is mapped (truncated file, or a segment straddling
+            # the window), so every read is checked against the mapped bytes
+            tiff = span[0] + 10
+            if tiff + 8 > len(data):
+                return None
+            byte_order = data[tiff : tiff + 2]
+            if byte_order == b"II":
+                endian = "<"
+            elif byte_order == b"MM":
+                endian = ">"
+            else:
+                return None
+
+            def ifd_at(offset_pos: int) -> dict[int, int] | None:
+                if offset_pos + 4 > len(data):
+                    return None
+                (offset,) = struct.unpack_from(endian + "I", data, offset_pos)
+                return _read_ifd_tags(data, tiff + offset, endian)
+
+            ifd0 = ifd_at(tiff + 4)
+            if ifd0 is None:
+                return None
+
+            dt_str = None
+            if 0x8769 in ifd0:
+                exif_ifd = ifd_at(ifd0[0x8769] + 8)
+                if exif_ifd is None:
+                    return None
+                if 0x9003 in exif_ifd:
+                    # DateTimeOriginal is ascii, stored inline when it fits in 4 bytes and at an offset otherwise
+                    entry = exif_ifd[0x9003]
+                    (length,) = struct.unpack_from(endian + "I", data, entry + 4)
+                    if length <= 4:
+                        start = entry + 8
+                    else:
+                        start = tiff + struct.unpack_from(endian + "I", data, entry + 8)[0]
+                    if start + length > len(data):
+                        return None
+                    dt_str = bytes(data[start : start + length]).rstrip(b"\x00").decode("ascii", errors="replace")
+
+            has_loc = False
+            if 0x8825 in ifd0:
+                gps_ifd = ifd_at(ifd0[0x8825] + 8)
+                if gps_ifd is None:
+                    return None
+                # GPSLatitudeRef, GPSLatitude, GPSLongitudeRef, GPSLongitude
+                has_loc = all(tag in gps_ifd for tag in (1, 2, 3, 4))
+
+            return dt_str, has_loc
+
+
+def write_photo_file(photo_path: str, prefix: bytes, prefix_len: int):
+    """
+    Rewrites a photo as prefix followed by the original file's bytes from prefix_len onwards, copied unchanged.
+    The new file is written alongside and swapped in with os.replace, so a failed write never leaves a truncated photo.
+    """
+    # A unique temp name, so concurrent writers can never share (and truncate) each other's temp file
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(photo_path) or ".", prefix=os.path.basename(photo_path) + ".", suffix=".tmp"
+    )
+    try:
+        with open(fd, "wb", buffering=1 << 20) as tmp_file, open(photo_path, "rb") as src_file:
+            tmp_file.write(prefix)
+            src_file.seek(prefix_len)
+            shutil.copyfileobj(src_file, tmp_file, 1 << 20)
+        shutil.copymode(photo_path, tmp_path)
+        os.replace(tmp_path, photo_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_location(
+    photo_path: str,
+    dms_lat: tuple[int, int, float],
+    lat_ref: str,
+    dms_lon: tuple[int, int, float],
+    lon_ref: str,
+    overwrite: bool,
+):
+    """
+    Writes an interpolated location to a photo.
+    Runs in a worker process, so it only takes picklable arguments.
+    """
+    from exif import Image
+
+    # Only the file up to the end of the exif segment is parsed and rebuilt, the image data after it is copied across
+    # as is. The prefix includes the next marker byte: exif's Image._parse_segments (exif==1.6.1, pinned in
+    # requirements.txt) scans forward from the end of APP1 to the next 0xFF to find where the segment ends.
+    # Without a recognizable exif segment the whole file is parsed, as exif then has to add one.
+    with open(photo_path, "rb") as image_file:
+        prefix = image_file.read(HEADER_WINDOW)
+        span = _exif_segment_span(prefix)
+        if span is None:
+            prefix += image_file.read()
+        elif span[1] + 1 <= len(prefix):
+            prefix = prefix[: span[1] + 1]
+        else:
+            prefix += image_file.read(span[1] + 1 - len(prefix))
+    photo = Image(prefix)
+
+    if overwrite and (hasattr(photo, "gps_latitude") or hasattr(photo, "gps_longitude")):
+        try:
+            del photo.gps_latitude
+            del photo.gps_longitude
+        except Exception as e:
+            print(e, "Could not delete location data on photo", photo_path, e)
 
-        # Write new location data to image
-        with open(photo_path, "wb") as image_file:
-            if overwrite and (hasattr(photo, "gps_latitude") or hasattr(photo, "gps_longitude")):
-                try:
-                    del photo.gps_latitude
-                    del photo.gps_longitude
-                except Exception as e:
-                    print(e, "Could not delete location data on photo", photo_path, e)
+    photo.gps_latitude_ref = lat_ref
+    photo.gps_latitude = dms_lat
+    photo.gps_longitude_ref = lon_ref
+    photo.gps_longitude = dms_lon
 
-            lat_d, lat_m, lat_s, lat_hemi = deg_to_dms(photolat)
-            dms_lat = (lat_d, lat_m, lat_s)
-            photo.gps_latitude_ref = "N" if lat_hemi == 1 else "S"
-            photo.gps_latitude = dms_lat
+    write_photo_file(photo_path, photo.get_file(), len(prefix))
 
-            lon_d, lon_m, lon_s, lon_hemi = deg_to_dms(photolon)
-            dms_lon = (lon_d, lon_m, lon_s)
-            photo.gps_longitude_ref = "E" if lon_hemi == 1 else "W"
-            photo.gps_longitude = dms_lon
 
-            image_file.write(photo.get_file())
+def tag_photos(
+    track: GpxTrack | None,
+    photos: list[PhotoSummary | str],
+    photo_date_offset: datetime.timedelta = None,
+    valid_filetypes=(".jpg", ".jpeg"),
+    overwrite=False,  # TODO add checkbox to GUI
+):
+    """
+    Adds location data to photos by interpolating timestamps from gps data.
+    Photos can be given as PhotoSummaries, whose cached exif details are used to pick the photos to tag,
+    or as paths, which are read first. Locations are interpolated in one vectorized pass and written in parallel.
+    """
+    import numpy as np
+
+    # Keyed by normalized path, so a photo listed twice (e.g. a folder added twice) is only tagged once
+    valid_filetypes = tuple(valid_filetypes)
+    unique_photos = {}
+    for p in photos:
+        path = p.path if isinstance(p, PhotoSummary) else p
+        if path.lower().endswith(valid_filetypes):
+            unique_photos.setdefault(os.path.normcase(os.path.abspath(path)), p)
+    photos = list(unique_photos.values())
+    if len(photos) == 0:
+        return
+    if track is None or len(track.ts) == 0:
+        print("skipping, no gps points to interpolate from")
+        return
+
+    offset_sec = photo_date_offset.total_seconds() if photo_date_offset else 0.0
+    mindt_ts = track.mindt_ts
+    maxdt_ts = track.maxdt_ts
+
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(photos))) as executor:
+        unread_paths = [p for p in photos if not isinstance(p, PhotoSummary)]
+        read_summaries = iter(executor.map(summarize, unread_paths, chunksize=8))
+        summaries = [p if isinstance(p, PhotoSummary) else next(read_summaries) for p in photos]
+
+        # Find the photos that need a location, and when they were taken
+        candidate_paths = []
+        candidate_times = []
+        for summary in summaries:
+            # Check if file has a time to interpolate from
+            if summary.dt is None:
+                print(f"{summary.path} : skipping, no time available")
+                continue
+
+            # Check if lat/long already exist on file. If so, skip
+            if summary.has_loc and not overwrite:
+                print(f"{summary.path} : skipping, location already exists")
+                continue
+
+            candidate_paths.append(summary.path)
+            candidate_times.append(summary.dt.timestamp())
+
+        # Check which photo times are inside bounds, all at once
+        ts_arr = np.fromiter(candidate_times, dtype=np.float64, count=len(candidate_times)) + offset_sec
+        in_bounds = (ts_arr >= mindt_ts) & (ts_arr <= maxdt_ts)
+
+        if not in_bounds.all():
+            min_t = datetime.datetime.fromtimestamp(mindt_ts).isoformat()
+            max_t = datetime.datetime.fromtimestamp(maxdt_ts).isoformat()
+            for i in np.flatnonzero(~in_bounds):
+                photo_t = datetime.datetime.fromtimestamp(ts_arr[i]).isoformat()
+                print(f"{candidate_paths[i]} : skipping, time {photo_t} outside of bounds {min_t} - {max_t}")
+
+        tag_paths = [candidate_paths[i] for i in np.flatnonzero(in_bounds)]
+        if len(tag_paths) == 0:
+            return
+        for photo_path in tag_paths:
+            print(f"{photo_path} : adding location")
+
+        # Interpolate all photos against the track at once
+        lats = np.interp(ts_arr[in_bounds], track.ts, track.lat)
+        lons = np.interp(ts_arr[in_bounds], track.ts, track.lon)
+
+        lat_d, lat_m, lat_s, lat_hemi = deg_to_dms_batch(lats)
+        dms_lats = list(zip(lat_d.tolist(), lat_m.tolist(), lat_s.tolist()))
+        lat_refs = np.where(lat_hemi == 1, "N", "S").tolist()
+
+        lon_d, lon_m, lon_s, lon_hemi = deg_to_dms_batch(lons)
+        dms_lons = list(zip(lon_d.tolist(), lon_m.tolist(), lon_s.tolist()))
+        lon_refs = np.where(lon_hemi == 1, "E", "W").tolist()
+
+        write_location = functools.partial(_write_location, overwrite=overwrite)
+        list(executor.map(write_location, tag_paths, dms_lats, lat_refs, dms_lons, lon_refs, chunksize=8))
 
 
 def DO_GUI():
+    import numpy as np
     import tkinter as tk
     from tkinter import ttk, filedialog
     from tkinterdnd2 import DND_FILES, TkinterDnD
@@ -184,9 +519,18 @@ def DO_GUI():
     class AppState:
         def __init__(self):
             self.all_files = []
-            self.images = []
-            self.points_df = pd.DataFrame()
+            self.summaries = []
+            # PhotoSummaries keyed by (path, mtime, size) so unchanged files are never reparsed,
+            # and the current key for each path, so the entry for a file's old version can be evicted
+            self.summary_cache = {}
+            self.summary_keys = {}
+            # summary fields as arrays, so details can be recomputed cheaply on every offset change
+            self.dt_arr = np.array([], dtype="datetime64[s]")
+            self.has_loc_arr = np.array([], dtype=bool)
+            self.track = None
             self.offset_mins = datetime.timedelta(0)
+            self._offset_after_id = None
+            self._gpx_after_id = None
 
         def add_folder(self):
             folder = filedialog.askdirectory()
@@ -227,26 +571,51 @@ def DO_GUI():
                     self.set_gpx_path(path)
                 elif os.path.isdir(path):
                     # TODO support walk instead of listdir?
-                    full_paths = [os.path.join(path, file) for file in os.listdir(path)]
+                    with os.scandir(path) as it:
+                        full_paths = [e.path for e in it if e.is_file() and e.name.lower().endswith((".jpg", ".jpeg"))]
                     self.add_photos(full_paths)
                 elif os.path.isfile(path):
                     self.add_photos([path])
 
         def clear_photos(self):
             file_listbox.delete(0, tk.END)
-            self.images = []
+            self.summaries = []
             self.all_files = []
+            self.summary_cache = {}
+            self.summary_keys = {}
+            self.update_photo_arrays()
             self.update_details()
 
         def add_photos(self, photo_paths: list[str]):
+            new_paths = []
             for full_filepath in photo_paths:
                 try:
-                    self.images.append(load_photo(full_filepath))
-                    self.all_files.append(full_filepath)
-                    file_listbox.insert(tk.END, full_filepath)
+                    self.summaries.append(self.load_summary(full_filepath))
+                    new_paths.append(full_filepath)
                 except Exception as e:
                     print(e)
-            self.update_details()
+            self.all_files.extend(new_paths)
+            self.update_photo_arrays()
+
+            # One insert call for the whole batch, so Tk only lays out the listbox once
+            if len(new_paths) > 0:
+                file_listbox.insert(tk.END, *new_paths)
+            root.after_idle(self.update_details)
+
+        def update_photo_arrays(self):
+            self.dt_arr = np.array([s.dt for s in self.summaries], dtype="datetime64[s]")
+            self.has_loc_arr = np.array([s.has_loc for s in self.summaries], dtype=bool)
+
+        def load_summary(self, path: str) -> PhotoSummary:
+            stat = os.stat(path)
+            key = (path, stat.st_mtime, stat.st_size)
+            if key not in self.summary_cache:
+                self.summary_cache[key] = summarize(path)
+                old_key = self.summary_keys.get(path)
+                if old_key is not None:
+                    del self.summary_cache[old_key]
+                self.summary_keys[path] = key
+            return self.summary_cache[key]
 
         def set_gpx_path(self, path: str):
             gpx_sv.set(path)  # triggers self.edit_gpx()
@@ -262,42 +631,45 @@ def DO_GUI():
             max_gps_dt = None
 
             loaded_files = len(self.all_files) > 0
-            loaded_gpx = len(self.points_df) > 0
+            loaded_gpx = self.track is not None and len(self.track.ts) > 0
 
             if loaded_files:
-                image_times = [get_photo_datetime(i) + self.offset_mins for i in self.images]
-                min_photo_dt = min(image_times)
-                max_photo_dt = max(image_times)
-                if min_photo_dt.date() == max_photo_dt.date():
-                    same_day = True
-                count_has_loc = sum([photo_has_lat_long(image) for image in self.images])
+                image_times = self.dt_arr[~np.isnat(self.dt_arr)] + np.timedelta64(self.offset_mins)
+                if len(image_times) > 0:
+                    min_photo_dt = image_times.min().astype(datetime.datetime)
+                    max_photo_dt = image_times.max().astype(datetime.datetime)
+                    if min_photo_dt.date() == max_photo_dt.date():
+                        same_day = True
+                count_has_loc = np.count_nonzero(self.has_loc_arr)
                 folder_details = [
                     f"{len(self.all_files)} images",
                     f"{count_has_loc} with location data",
                 ]
 
             if loaded_gpx:
-                min_gps_dt = self.points_df["Datetime"].min()
-                max_gps_dt = self.points_df["Datetime"].max()
+                min_gps_dt = self.track.mindt
+                max_gps_dt = self.track.maxdt
                 if min_gps_dt.date() == max_gps_dt.date():
                     same_day = True
                 gpx_details = [
-                    f"{len(self.points_df)} gpx points",
+                    f"{len(self.track.ts)} gpx points",
                 ]
 
-            if loaded_files and loaded_gpx:
+            if min_photo_dt is not None and loaded_gpx:
                 if min_photo_dt.date() == max_photo_dt.date() == min_gps_dt.date() == max_gps_dt.date():
                     same_day = True
                 else:
                     same_day = False
-                good_images = [it for it in image_times if it >= min_gps_dt and it <= max_gps_dt]
-                both_details = [f"{len(good_images)} images in bounds"]
+                good_images = np.count_nonzero(
+                    (image_times >= np.datetime64(min_gps_dt)) & (image_times <= np.datetime64(max_gps_dt))
+                )
+                both_details = [f"{good_images} images in bounds"]
 
             if same_day:
                 dt_format = "%H:%M:%S"
             else:
                 dt_format = "%Y-%m-%d %H:%M:%S"
-            if loaded_files:
+            if min_photo_dt is not None:
                 folder_details.append(f"{min_photo_dt.strftime(dt_format)} - {max_photo_dt.strftime(dt_format)}")
             if loaded_gpx:
                 gpx_details.append(f"{min_gps_dt.strftime(dt_format)} - {max_gps_dt.strftime(dt_format)}")
@@ -315,12 +687,19 @@ def DO_GUI():
             )
 
         def edit_gpx(self, event):
-            path = event.get()
-            try:
-                self.points_df = extract_points(path)
-            except Exception as e:
-                print(type(e), e)
-                self.points_df = pd.DataFrame()
+            # wait for typing to settle before parsing, rather than reparsing the file on every keystroke
+            if self._gpx_after_id is not None:
+                root.after_cancel(self._gpx_after_id)
+            self._gpx_after_id = root.after(250, self._do_edit_gpx, event.get())
+
+        def _do_edit_gpx(self, path: str):
+            self._gpx_after_id = None
+            self.track = None
+            if os.path.isfile(path) and path.lower().endswith(".gpx"):
+                try:
+                    self.track = extract_points(path)
+                except Exception as e:
+                    print(type(e), e)
             self.update_details()
 
         def edit_offset(self, event):
@@ -330,17 +709,25 @@ def DO_GUI():
             except ValueError:
                 value = 0
             self.offset_mins = datetime.timedelta(minutes=value)
+
+            # coalesce keystrokes into one details refresh
+            if self._offset_after_id is not None:
+                root.after_cancel(self._offset_after_id)
+            self._offset_after_id = root.after(150, self._do_edit_offset)
+
+        def _do_edit_offset(self):
+            self._offset_after_id = None
             self.update_details()
 
         def set_details(self, text):
             detail_sv.set(text)
 
         def on_go_button_click(self):
-            tag_photos(self.points_df, self.all_files, self.offset_mins)
+            tag_photos(self.track, self.summaries, self.offset_mins)
 
-            # reload photos
-            for i, file in enumerate(self.all_files):
-                self.images[i] = load_photo(file)
+            # refresh summaries, only photos rewritten by tag_photos are reparsed and their old entries evicted
+            self.summaries = [self.load_summary(s.path) for s in self.summaries]
+            self.update_photo_arrays()
 
             self.update_details()
 
@@ -413,29 +800,31 @@ def DO_GUI():
 
 
 def test_strip_locations(folder):
+    from exif import Image
+
     paths = [os.path.join(folder, f) for f in os.listdir(folder)]
     for photo_path in paths:
         try:
             with open(photo_path, "rb") as image_file:
-                photo = Image(image_file)
-            with open(photo_path, "wb") as image_file:
-                try:
-                    del photo.gps_latitude_ref
-                except Exception as e:
-                    print(e)
-                try:
-                    del photo.gps_latitude
-                except Exception as e:
-                    print(e)
-                try:
-                    del photo.gps_longitude_ref
-                except Exception as e:
-                    print(e)
-                try:
-                    del photo.gps_longitude
-                except Exception as e:
-                    print(e)
-                image_file.write(photo.get_file())
+                original = image_file.read()
+            photo = Image(original)
+            try:
+                del photo.gps_latitude_ref
+            except Exception as e:
+                print(e)
+            try:
+                del photo.gps_latitude
+            except Exception as e:
+                print(e)
+            try:
+                del photo.gps_longitude_ref
+            except Exception as e:
+                print(e)
+            try:
+                del photo.gps_longitude
+            except Exception as e:
+                print(e)
+            write_photo_file(photo_path, photo.get_file(), len(original))
         except Exception as e:
             print(e)
 
@@ -451,7 +840,7 @@ if __name__ == "__main__":
     #     offset_num = 0
     # offset_mins = datetime.timedelta(minutes=float(offset_num))
 
-    # points_df = extract_points(gpx_file)
-    # tag_photos(points_df, photos_folder, offset_mins)
+    # track = extract_points(gpx_file)
+    # tag_photos(track, photos_folder, offset_mins)
 
     DO_GUI()
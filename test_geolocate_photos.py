@@ -0,0 +1,173 @@
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+import geolocate_photos as gp
+
+try:
+    from exif import Image
+except ImportError:
+    Image = None
+
+DT = "2023:05:06 07:08:09"
+
+
+def build_exif_header(byte_order: bytes, dt: str | None = DT, gps_tags=(1, 2, 3, 4)) -> bytes:
+    """
+    Builds SOI, APP0 and a hand-written APP1 exif segment with an Exif IFD (DateTimeOriginal) and a GPS IFD
+    """
+    e = "<" if byte_order == b"II" else ">"
+    dt_bytes = dt.encode() + b"\x00" if dt is not None else b""
+
+    ifd0_off = 8
+    exif_off = ifd0_off + 2 + 2 * 12 + 4
+    n_exif = 1 if dt is not None else 0
+    gps_off = exif_off + 2 + n_exif * 12 + 4
+    dt_off = gps_off + 2 + len(gps_tags) * 12 + 4
+
+    tiff = byte_order + struct.pack(e + "HI", 42, ifd0_off)
+    tiff += struct.pack(e + "H", 2)
+    tiff += struct.pack(e + "HHII", 0x8769, 4, 1, exif_off)
+    tiff += struct.pack(e + "HHII", 0x8825, 4, 1, gps_off)
+    tiff += struct.pack(e + "I", 0)
+    tiff += struct.pack(e + "H", n_exif)
+    if dt is not None:
+        tiff += struct.pack(e + "HHII", 0x9003, 2, len(dt_bytes), dt_off)
+    tiff += struct.pack(e + "I", 0)
+    tiff += struct.pack(e + "H", len(gps_tags))
+    for tag in gps_tags:
+        tiff += struct.pack(e + "HHII", tag, 2, 2, 0)
+    tiff += struct.pack(e + "I", 0)
+    tiff += dt_bytes
+
+    app1 = b"Exif\x00\x00" + tiff
+    return b"\xff\xd8" + b"\xff\xe0\x00\x04ab" + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+
+
+def build_scan(length: int = 2000) -> bytes:
+    rng = random.Random(length)
+    return b"\xff\xda\x00\x02" + bytes(rng.randrange(255) for _ in range(length)) + b"\xff\xd9"
+
+
+def bare_jpeg() -> bytes:
+    return b"\xff\xd8" + b"\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00" + build_scan(300000)
+
+
+class ProbeJpegHeaderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "photo.jpg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def probe(self, data: bytes, **kwargs):
+        with open(self.path, "wb") as f:
+            f.write(data)
+        return gp.probe_jpeg_header(self.path, **kwargs)
+
+    def test_little_and_big_endian(self):
+        for byte_order in (b"II", b"MM"):
+            with self.subTest(byte_order=byte_order):
+                self.assertEqual(self.probe(build_exif_header(byte_order) + build_scan()), (DT, True))
+
+    def test_missing_datetime_and_partial_gps(self):
+        self.assertEqual(self.probe(build_exif_header(b"II", dt=None) + build_scan()), (None, True))
+        self.assertEqual(self.probe(build_exif_header(b"MM", gps_tags=(1, 2)) + build_scan()), (DT, False))
+
+    def test_not_probeable_returns_none(self):
+        self.assertIsNone(self.probe(b""))
+        self.assertIsNone(self.probe(b"not a jpeg"))
+        self.assertIsNone(self.probe(bare_jpeg()))
+
+    def test_truncation_at_every_byte(self):
+        data = build_exif_header(b"II") + build_scan(16)
+        for cut in range(len(data)):
+            with self.subTest(cut=cut):
+                result = self.probe(data[:cut])
+                self.assertIn(result, (None, (DT, True), (DT, False), (None, True), (None, False)))
+
+    def test_app1_crossing_window(self):
+        header = build_exif_header(b"II")
+        after_soi = header[2 + 6 :]  # APP1 only, without SOI and APP0
+        for shift in range(0, 24):
+            app2_len = gp.HEADER_WINDOW - 2 - 4 - shift
+            app2 = b"\xff\xe2" + struct.pack(">H", app2_len + 2) + b"\x00" * app2_len
+            with self.subTest(shift=shift):
+                self.assertIsNone(self.probe(b"\xff\xd8" + app2 + after_soi + build_scan()))
+
+    def test_random_corruption_never_raises(self):
+        data = build_exif_header(b"MM") + build_scan(16)
+        rng = random.Random(0)
+        for _ in range(500):
+            corrupted = bytearray(data)
+            for _ in range(3):
+                corrupted[rng.randrange(14, len(data) - 20)] = rng.randrange(256)
+            self.probe(bytes(corrupted))
+
+    @unittest.skipIf(Image is None, "exif is not installed")
+    def test_matches_load_photo(self):
+        photo = Image(bare_jpeg())
+        photo.datetime_original = DT
+        with_dt = photo.get_file()
+        photo.gps_latitude_ref = "N"
+        photo.gps_latitude = (12, 3, 4.5)
+        photo.gps_longitude_ref = "W"
+        photo.gps_longitude = (1, 2, 3.25)
+        with_loc = photo.get_file()
+
+        for data in (with_dt, with_loc):
+            probed = self.probe(data)
+            _, has_loc, _, dt_str = gp.load_photo(self.path)
+            self.assertEqual(probed, (dt_str, has_loc))
+
+
+@unittest.skipIf(Image is None, "exif is not installed")
+class WriteLocationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "photo.jpg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def whole_file_tagged(data: bytes) -> bytes:
+        photo = Image(data)
+        photo.gps_latitude_ref = "N"
+        photo.gps_latitude = (12, 3, 4.5)
+        photo.gps_longitude_ref = "W"
+        photo.gps_longitude = (1, 2, 3.25)
+        return photo.get_file()
+
+    def test_splice_matches_whole_file_get_file(self):
+        photo = Image(bare_jpeg())
+        photo.datetime_original = DT
+        with_exif = photo.get_file()
+
+        for name, data in (("with exif", with_exif), ("without exif", bare_jpeg())):
+            with self.subTest(name):
+                with open(self.path, "wb") as f:
+                    f.write(data)
+                gp._write_location(self.path, (12, 3, 4.5), "N", (1, 2, 3.25), "W", False)
+                with open(self.path, "rb") as f:
+                    self.assertEqual(f.read(), self.whole_file_tagged(data))
+                self.assertEqual(os.listdir(self.tmp.name), ["photo.jpg"])
+
+    def test_overwrite_location(self):
+        with open(self.path, "wb") as f:
+            f.write(self.whole_file_tagged(bare_jpeg()))
+        gp._write_location(self.path, (50, 0, 1.0), "S", (3, 4, 5.0), "E", True)
+
+        photo, has_loc, _, _ = gp.load_photo(self.path)
+        self.assertTrue(has_loc)
+        self.assertEqual((photo.gps_latitude, photo.gps_latitude_ref), ((50.0, 0.0, 1.0), "S"))
+        self.assertEqual((photo.gps_longitude, photo.gps_longitude_ref), ((3.0, 4.0, 5.0), "E"))
+        with open(self.path, "rb") as f:
+            self.assertTrue(f.read().endswith(build_scan(300000)))
+
+
+if __name__ == "__main__":
+    unittest.main()